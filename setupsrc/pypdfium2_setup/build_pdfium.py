@@ -7,6 +7,7 @@
 import os
 import sys
 import shutil
+import hashlib
 import argparse
 import urllib.request as url_request
 from pathlib import Path, WindowsPath
@@ -20,6 +21,10 @@ PatchDir       = SBDir / "patches"
 DepotToolsDir  = SBDir / "depot_tools"
 PDFiumDir      = SBDir / "pdfium"
 PDFiumBuildDir = PDFiumDir / "out" / "Default"
+BuildCacheDir  = SBDir / "build_cache"
+
+# depot_tools directories that gclient/gn/ninja don't use at runtime (test suites, recipe modules, docs)
+DepotToolsSkipDirs = ["tests", "testing_support", "recipes", "man"]
 
 PatchesMain = [
     (PatchDir/"shared_library.patch", PDFiumDir),
@@ -29,6 +34,9 @@ PatchesWindows = [
     (PatchDir/"win"/"pdfium.patch", PDFiumDir),
     (PatchDir/"win"/"build.patch", PDFiumDir/"build"),
 ]
+ResourcesRcTemplate = PatchDir / "win" / "resources.rc"
+
+# unbundle/replace_gn_files.py edits the GN files of these (separate) dependency repositories
 
 
 # run `gn args out/Default/ --list` for build config docs
@@ -79,14 +87,21 @@ def dl_depottools(do_update):
             is_update = False
     else:
         print("DepotTools: Download ...")
-        run_cmd(["git", "clone", "--depth", "1", DepotToolsURL, DepotToolsDir], cwd=SBDir)
+        # blobless partial clone: only the blobs actually checked out are downloaded (falls back to a regular clone if the server does not support filtering)
+        run_cmd(["git", "clone", "--depth=1", "--filter=blob:none", "--single-branch", "--no-checkout", DepotToolsURL, DepotToolsDir], cwd=SBDir)
+        # skip the parts of depot_tools that are not needed to run gclient, gn and ninja
+        # (`sparse-checkout set --no-cone` requires git >= 2.35 - on older versions, just check out everything)
+        comp_process = run_cmd(["git", "sparse-checkout", "set", "--no-cone", "/*", *[f"!/{d}/" for d in DepotToolsSkipDirs]], cwd=DepotToolsDir, check=False)
+        if comp_process.returncode != 0:
+            print("DepotTools: git sparse-checkout unavailable, falling back to a full checkout.", file=sys.stderr)
+        run_cmd(["git", "checkout"], cwd=DepotToolsDir)
     
     os.environ["PATH"] += os.pathsep + str(DepotToolsDir)
     
     return is_update
 
 
-def dl_pdfium(GClient, do_update, revision):
+def dl_pdfium(GClient, do_update, revision, n_jobs):
     
     is_sync = True
     
@@ -103,7 +118,7 @@ def dl_pdfium(GClient, do_update, revision):
     
     if is_sync:
         # TODO consider passing -D ?
-        run_cmd([GClient, "sync", "--revision", f"origin/{revision}", "--no-history", "--shallow"], cwd=SBDir)
+        run_cmd([GClient, "sync", "--revision", f"origin/{revision}", "--no-history", "--shallow", *(["--jobs", n_jobs] if n_jobs else [])], cwd=SBDir)
         # quick & dirty fix to make a versioned commit available (pdfium gets tagged frequently, so this should be more than enough in practice)
         # FIXME want to avoid static number of commits, and instead check out exactly up to latest versioned commit
         run_cmd(["git", "fetch", "--depth=100"], cwd=PDFiumDir)
@@ -149,7 +164,7 @@ def identify_pdfium():
 
 
 def _create_resources_rc(pdfium_build):
-    input_path = PatchDir / "win" / "resources.rc"
+    input_path = ResourcesRcTemplate
     output_path = PDFiumDir / "resources.rc"
     content = input_path.read_text()
     content = content.replace("$VERSION_CSV", str(pdfium_build))
@@ -157,15 +172,31 @@ def _create_resources_rc(pdfium_build):
     output_path.write_text(content)
 
 
-def _apply_patchset(patchset, check=True):
+def _apply_patches(patches, cwd, check, verbose):
+    # per-hunk output is only printed on request - failures are reported either way
+    verbosity = ["-v"] if verbose else []
+    run_cmd(["git", "apply", "--ignore-space-change", "--ignore-whitespace", "--whitespace=nowarn", *verbosity, *patches], cwd=cwd, check=check)
+
+
+def _apply_patchset(patchset, check=True, verbose=False):
+    # group patches by cwd so we only need one `git apply` call per repository
+    patches_for_cwd = {}
     for patch, cwd in patchset:
-        run_cmd(["git", "apply", "--ignore-space-change", "--ignore-whitespace", "-v", patch], cwd=cwd, check=check)
+        patches_for_cwd.setdefault(cwd, []).append(patch)
+    for cwd, patches in patches_for_cwd.items():
+        _apply_patches(patches, cwd, check, verbose)
+
+
+def get_patchset():
+    if sys.platform.startswith("win32"):
+        return PatchesMain + PatchesWindows
+    else:
+        return PatchesMain
 
 
-def patch_pdfium(pdfium_build):
-    _apply_patchset(PatchesMain)
+def patch_pdfium(pdfium_build, verbose=False):
+    _apply_patchset(get_patchset(), verbose=verbose)
     if sys.platform.startswith("win32"):
-        _apply_patchset(PatchesWindows)
         _create_resources_rc(pdfium_build)
 
 
@@ -179,13 +210,61 @@ def build(Ninja, target):
     run_cmd([Ninja, "-C", PDFiumBuildDir, target], cwd=PDFiumDir)
 
 
+def get_build_key(config):
+    
+    # The key covers the build config, the contents of our patches (and of the resources.rc template on Windows), and commit and tracked changes of every repository we modify: pdfium itself and the repositories our patches apply to (e.g. build/ on Windows).
+    # Other dependency repositories are pinned through pdfium's DEPS file, so they are covered by pdfium's commit hash. Untracked files and local changes to unmodified dependency repositories are not taken into account.
+    # Builds against system libraries are never cached, as the key cannot capture the installed headers and sonames.
+    
+    patchset = get_patchset()
+    files = [patch for patch, _ in patchset]
+    if sys.platform.startswith("win32"):
+        files.append(ResourcesRcTemplate)
+    repos = {PDFiumDir, *(cwd for _, cwd in patchset)}
+    
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(config.encode("utf-8") + b"\0")
+    for fp in files:
+        hasher.update(fp.read_bytes() + b"\0")
+    for repo in sorted(repos):
+        for command in (["git", "rev-parse", "HEAD"], ["git", "diff", "HEAD"]):
+            hasher.update(run_cmd(command, cwd=repo, capture=True).encode("utf-8") + b"\0")
+    
+    return hasher.hexdigest()
+
+
+def _get_cached_build_key():
+    key_file = BuildCacheDir / "key.txt"
+    return key_file.read_text() if key_file.exists() else None
+
+
+def _store_build_cache(build_key, libname):
+    # Only the latest build is kept, so the cache does not grow over time. Remove sourcebuild/build_cache/ to force a rebuild.
+    if BuildCacheDir.exists():
+        shutil.rmtree(BuildCacheDir)
+    BuildCacheDir.mkdir(parents=True)
+    shutil.copy(PDFiumBuildDir/libname, BuildCacheDir/libname)
+    # write the key last, so an interrupted copy can't be mistaken for a valid cache
+    (BuildCacheDir / "key.txt").write_text(build_key)
+
+
+def _link_or_copy(src, dst):
+    # build and data dir are usually on the same filesystem, so a hardlink avoids copying the binary
+    if dst.exists():
+        dst.unlink()
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy(src, dst)
+
+
 def pack(v_short, v_post):
     
     dest_dir = DataDir / ExtPlats.sourcebuild
     dest_dir.mkdir(parents=True, exist_ok=True)
     
     libname = LibnameForSystem[Host.system]
-    shutil.copy(PDFiumBuildDir/libname, dest_dir/libname)
+    _link_or_copy(PDFiumBuildDir/libname, dest_dir/libname)
     write_pdfium_info(dest_dir, v_short, origin="sourcebuild", **v_post)
     
     # We want to use local headers instead of downloading with build_pdfium_bindings(), therefore call run_ctypesgen() directly
@@ -200,21 +279,17 @@ def get_tool(name):
     return bin
 
 
+def _serialise_value(value):
+    if isinstance(value, bool):
+        return str(value).lower()
+    elif isinstance(value, str):
+        return f'"{value}"'
+    else:
+        raise TypeError(f"Not sure how to serialise type {type(value).__name__}")
+
+
 def serialise_config(config_dict):
-    
-    parts = []
-    
-    for key, value in config_dict.items():
-        p = f"{key} = "
-        if isinstance(value, bool):
-            p += str(value).lower()
-        elif isinstance(value, str):
-            p += f'"{value}"'
-        else:
-            raise TypeError(f"Not sure how to serialise type {type(value).__name__}")
-        parts.append(p)
-    
-    return "\n".join(parts)
+    return "\n".join(f"{key} = {_serialise_value(value)}" for key, value in config_dict.items())
 
 
 def main(
@@ -223,6 +298,8 @@ def main(
         b_target = None,
         b_use_syslibs = False,
         b_win_sdk_dir = None,
+        b_jobs = None,
+        b_verbose = False,
     ):
     
     # NOTE defaults handled internally to avoid duplication with parse_args()
@@ -245,15 +322,15 @@ def main(
     GN      = get_tool("gn")
     Ninja   = get_tool("ninja")
     
-    pdfium_dl_done = dl_pdfium(GClient, b_update, b_revision)
+    pdfium_dl_done = dl_pdfium(GClient, b_update, b_revision, b_jobs)
     v_short, v_post = identify_pdfium()
     print(f"Version {v_short} {v_post}", file=sys.stderr)
     
     if pdfium_dl_done:
-        patch_pdfium(v_short)
+        patch_pdfium(v_short, b_verbose)
     if b_use_syslibs:
         _dl_unbundler()
-
+    
     if b_use_syslibs:
         run_cmd(["python3", "build/linux/unbundle/replace_gn_files.py", "--system-libraries", "icu"], cwd=PDFiumDir)
     
@@ -263,8 +340,22 @@ def main(
     config_str = serialise_config(config_dict)
     print(f"\nBuild configuration:\n{config_str}\n")
     
-    configure(GN, config_str)
-    build(Ninja, b_target)
+    # Only the library is cached, so other targets (e.g. pdfium_all, which includes tests) always go through ninja. Syslibs builds depend on system state not covered by the key, so they are not cached either.
+    libname = LibnameForSystem[Host.system]
+    build_key = get_build_key(config_str) if b_target == "pdfium" and not b_use_syslibs else None
+    if build_key and _get_cached_build_key() == build_key:
+        print(f"Using cached build {build_key}")
+        PDFiumBuildDir.mkdir(parents=True, exist_ok=True)
+        # the build output may be hardlinked to the data dir by pack(), so unlink rather than overwrite in place
+        if (PDFiumBuildDir/libname).exists():
+            (PDFiumBuildDir/libname).unlink()
+        shutil.copy(BuildCacheDir/libname, PDFiumBuildDir/libname)
+    else:
+        configure(GN, config_str)
+        build(Ninja, b_target)
+        if build_key:
+            _store_build_cache(build_key, libname)
+    
     pack(v_short, v_post)
 
 
@@ -296,6 +387,16 @@ def parse_args(argv):
         type = WindowsPath,
         help = "Path to the Windows SDK (Windows only)",
     )
+    parser.add_argument(
+        "--jobs", "-j",
+        type = int,
+        help = "Number of dependency repositories gclient may sync in parallel (defaults to gclient's own choice).",
+    )
+    parser.add_argument(
+        "--verbose", "-v",
+        action = "store_true",
+        help = "Print per-hunk output when applying patches.",
+    )
     
     return parser.parse_args(argv)
 
@@ -23,10 +23,13 @@ SubCommands = {
     "toc":            "print table of contents",
 }
 
-CmdToModule = {n: importlib.import_module(f"pypdfium2._cli.{n.replace('-', '_')}") for n in SubCommands}
 
+def get_cmd_module(name):
+    # subcommand modules are imported on demand, so a CLI call only pays for the subcommand it uses
+    return importlib.import_module(f"pypdfium2._cli.{name.replace('-', '_')}")
 
-def get_parser():
+
+def get_parser(attach_cmds=SubCommands):
     
     main_parser = argparse.ArgumentParser(
         prog = "pypdfium2",
@@ -42,21 +45,30 @@ def get_parser():
     
     for name, help in SubCommands.items():
         subparser = subparsers.add_parser(name, description=help, help=help)
-        CmdToModule[name].attach(subparser)
+        if name in attach_cmds:
+            get_cmd_module(name).attach(subparser)
     
     return main_parser
 
 
+def _get_requested_cmd(raw_args):
+    # the main parser has no options that take a value, so the first positional argument is the subcommand
+    for arg in raw_args:
+        if not arg.startswith("-"):
+            return arg
+    return None
+
+
 def api_main(raw_args=sys.argv[1:]):
     
-    parser = get_parser()
+    parser = get_parser( attach_cmds=(_get_requested_cmd(raw_args), ) )
     args = parser.parse_args(raw_args)
     
     if not args.subcommand:
         parser.print_help()
         return
     
-    CmdToModule[args.subcommand].main(args)
+    get_cmd_module(args.subcommand).main(args)
 
 
 def cli_main():
@@ -23,6 +23,9 @@ try:
 except ImportError:
     numpy = None
 
+# indexed by rev_byteorder
+_BitmapTypeToStrForOrder = (pdfium_i.BitmapTypeToStr, pdfium_i.BitmapTypeToStrReverse)
+
 
 class PdfBitmap (pdfium_i.AutoCloseable):
     """
@@ -53,7 +56,8 @@ class PdfBitmap (pdfium_i.AutoCloseable):
         self.raw, self.buffer, self.width, self.height = raw, buffer, width, height
         self.stride, self.format, self.rev_byteorder = stride, format, rev_byteorder
         self.n_channels = pdfium_i.BitmapTypeToNChannels[self.format]
-        self.mode = (pdfium_i.BitmapTypeToStrReverse if self.rev_byteorder else pdfium_i.BitmapTypeToStr)[self.format]
+        self.mode = _BitmapTypeToStrForOrder[bool(self.rev_byteorder)][self.format]
+        self._color_tohex = pdfium_i.ColorToHexForOrder[bool(self.rev_byteorder)]
         super().__init__(pdfium_c.FPDFBitmap_Destroy, needs_free=needs_free, obj=self.buffer)
     
     
@@ -97,7 +101,8 @@ class PdfBitmap (pdfium_i.AutoCloseable):
             buffer_ptr = pdfium_c.FPDFBitmap_GetBuffer(raw)
             if buffer_ptr is None:
                 raise PdfiumError("Failed to get bitmap buffer (null pointer returned)")
-            buffer = ctypes.cast(buffer_ptr, ctypes.POINTER(ctypes.c_ubyte * (stride * height))).contents
+            # buffer_ptr is a plain address (c_void_p restype), so we can create the array view directly rather than going through cast() and .contents
+            buffer = (ctypes.c_ubyte * (stride * height)).from_address(buffer_ptr)
         else:
             needs_free = False
             buffer = ex_buffer
@@ -161,8 +166,7 @@ class PdfBitmap (pdfium_i.AutoCloseable):
             color (tuple[int, int, int, int]):
                 RGBA fill color (a tuple of 4 integers ranging from 0 to 255).
         """
-        c_color = pdfium_i.color_tohex(color, self.rev_byteorder)
-        pdfium_c.FPDFBitmap_FillRect(self, left, top, width, height, c_color)
+        pdfium_c.FPDFBitmap_FillRect(self, left, top, width, height, self._color_tohex(color))
     
     
     # Requirement: If the result is a view of the buffer (not a copy), it keeps the referenced memory valid.
@@ -265,7 +269,7 @@ class PdfBitmap (pdfium_i.AutoCloseable):
             pil_image = _pil_convert_for_pdfium(pil_image)
             format = pdfium_i.BitmapStrReverseToConst[pil_image.mode]
         
-        py_buffer = pil_image.tobytes()
+        py_buffer = _pil_tobytes_for_pdfium(pil_image)
         if recopy:
             buffer = (ctypes.c_ubyte * len(py_buffer)).from_buffer_copy(py_buffer)
         else:
@@ -291,19 +295,27 @@ def _pil_convert_for_pdfium(pil_image):
     else:
         pil_image = pil_image.convert("RGB")
     
-    # convert RGB(A/X) to BGR(A) for PDFium
-    if pil_image.mode == "RGB":
-        r, g, b = pil_image.split()
-        pil_image = PIL.Image.merge("RGB", (b, g, r))
-    elif pil_image.mode == "RGBA":
-        r, g, b, a = pil_image.split()
-        pil_image = PIL.Image.merge("RGBA", (b, g, r, a))
+    return pil_image
+
+
+# PIL's raw encoder can reorder the channels while copying out the pixel data, so RGB(A) input needs no separate conversion pass.
+_PilToPdfiumRawModes = {"L": "L", "RGB": "BGR", "RGBA": "BGRA"}
+
+
+def _pil_tobytes_for_pdfium(pil_image):
+    
+    if pil_image.mode in _PilToPdfiumRawModes:
+        return pil_image.tobytes("raw", _PilToPdfiumRawModes[pil_image.mode])
+    
     elif pil_image.mode == "RGBX":
-        # technically the x channel may be unnecessary, but preserve what the caller passes in
-        r, g, b, x = pil_image.split()
-        pil_image = PIL.Image.merge("RGBX", (b, g, r, x))
+        # PIL's BGRX packer zeroes the x channel. Technically the x channel may be unnecessary, but preserve what the caller passes in.
+        # This costs a second copy (tobytes() returns immutable bytes, so we copy into a bytearray), but R and B are then swapped in-place and the result is wrapped without further copying.
+        py_buffer = bytearray(pil_image.tobytes())
+        py_buffer[0::4], py_buffer[2::4] = py_buffer[2::4], py_buffer[0::4]
+        return (ctypes.c_ubyte * len(py_buffer)).from_buffer(py_buffer)
     
-    return pil_image
+    else:
+        raise ValueError(f"Unsupported PIL image mode '{pil_image.mode}'.")
 
 
 PdfBitmapInfo = namedtuple("PdfBitmapInfo", "width height stride format rev_byteorder n_channels mode")
@@ -5,24 +5,33 @@ import ctypes
 import pypdfium2.raw as pdfium_c
 
 
-def color_tohex(color, rev_byteorder):
-    
+def _check_color(color):
     if len(color) != 4:
         raise ValueError("Color must consist of exactly 4 values.")
-    if not all(0 <= c <= 255 for c in color):
+    # combined check for all channels: any bit above the lowest 8 (including the sign of negative values) means out of range
+    r, g, b, a = color
+    if (r | g | b | a) >> 8:
         raise ValueError("Color value exceeds boundaries.")
-    
+    return color
+
+
+def _color_tohex_argb(color):
+    r, g, b, a = _check_color(color)
+    return (a << 24) | (r << 16) | (g << 8) | b
+
+
+def _color_tohex_abgr(color):
     # different color interpretation with FPDF_REVERSE_BYTE_ORDER might be a bug? at least it's not documented.
-    r, g, b, a = color
-    channels = (a, b, g, r) if rev_byteorder else (a, r, g, b)
-    
-    c_color = 0
-    shift = 24
-    for c in channels:
-        c_color |= c << shift
-        shift -= 8
-    
-    return c_color
+    r, g, b, a = _check_color(color)
+    return (a << 24) | (b << 16) | (g << 8) | r
+
+
+#: Color converters indexed by *rev_byteorder*, so callers with a fixed byte order can resolve the converter once.
+ColorToHexForOrder = (_color_tohex_argb, _color_tohex_abgr)
+
+
+def color_tohex(color, rev_byteorder):
+    return ColorToHexForOrder[bool(rev_byteorder)](color)
 
 
 def set_callback(struct, fname, callback):
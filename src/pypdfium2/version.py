@@ -45,19 +45,12 @@ class _abc_version:
         return tuple(self._data[k] for k in self._TAG_FIELDS)
     
     def _craft_tag(self):
-        return ".".join(str(v) for v in self.api_tag)
+        return ".".join(map(str, self.api_tag))
     
-    def _craft_desc(self, extra=[]):
-        
-        local_ver = []
+    def _craft_desc(self, extra=()):
         if self.n_commits > 0:
-            local_ver += [str(self.n_commits), str(self.hash)]
-        local_ver += extra
-        
-        desc = ""
-        if local_ver:
-            desc += "+" + ".".join(local_ver)
-        return desc
+            extra = (str(self.n_commits), str(self.hash), *extra)
+        return "+" + ".".join(extra) if extra else ""
     
     @cached_property
     def version(self):
@@ -1,2 +1,36 @@
 # SPDX-FileCopyrightText: 2024 geisserml <geisserml@gmail.com>
 # SPDX-License-Identifier: Apache-2.0 OR BSD-3-Clause
+
+import pytest
+import PIL.Image
+import pypdfium2 as pdfium
+
+
+@pytest.mark.parametrize(
+    ["mode", "color", "exp_bitmap_mode"],
+    [
+        ("L", 100, "L"),
+        ("RGB", (10, 20, 30), "BGR"),
+        ("RGBA", (10, 20, 30, 40), "BGRA"),
+        ("RGBX", (10, 20, 30, 255), "BGRX"),
+        ("1", 1, "L"),
+        ("LA", (100, 40), "BGRA"),
+    ]
+)
+def test_from_pil(mode, color, exp_bitmap_mode):
+    
+    pil_image = PIL.Image.new(mode, (3, 2), color)
+    bitmap = pdfium.PdfBitmap.from_pil(pil_image)
+    assert bitmap.mode == exp_bitmap_mode
+    assert (bitmap.width, bitmap.height) == pil_image.size
+    
+    out_image = bitmap.to_pil()
+    assert out_image.tobytes() == pil_image.convert(out_image.mode).tobytes()
+
+
+def test_from_pil_rgbx_keeps_x():
+    pil_image = PIL.Image.new("RGBX", (3, 2), (10, 20, 30, 40))
+    bitmap = pdfium.PdfBitmap.from_pil(pil_image)
+    array = bitmap.to_numpy()
+    assert (array[..., :3] == (30, 20, 10)).all()
+    assert (array[..., 3] == 40).all()
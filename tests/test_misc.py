@@ -27,6 +27,20 @@ def test_color_tohex(color_in, rev_byteorder, exp_color):
     assert pdfium_c.FPDF_GetBValue(exp_color) == channels[3]
 
 
+@pytest.mark.parametrize(
+    "color_in",
+    [
+        (256, 0, 0, 255),
+        (0, -1, 0, 255),
+        (0, 0, 0, 0, 0),
+        (0, 0, 0),
+    ]
+)
+def test_color_tohex_invalid(color_in):
+    with pytest.raises(ValueError):
+        pdfium_i.color_tohex(color_in, False)
+
+
 def _filter(prefix, skips=[], type=int):
     items = []
     for attr in dir(pdfium_c):